@@ -1,11 +1,20 @@
 """
 Scripts package for AI-Powered Job Application Automation.
+
+Public names are imported lazily (PEP 562), so importing the package for
+config or logging does not pull in PyMuPDF, FAISS or sentence-transformers.
 """
 
-from scripts.document_parser import DocumentParser
-from scripts.vector_store import VectorStore
-from scripts.config_loader import ConfigLoader, get_config
-from scripts.logger_config import setup_logger, get_logger
+import importlib
+
+_LAZY_IMPORTS = {
+    'DocumentParser': 'scripts.document_parser',
+    'VectorStore': 'scripts.vector_store',
+    'ConfigLoader': 'scripts.config_loader',
+    'get_config': 'scripts.config_loader',
+    'setup_logger': 'scripts.logger_config',
+    'get_logger': 'scripts.logger_config',
+}
 
 __all__ = [
     'DocumentParser',
@@ -16,3 +25,16 @@ __all__ = [
     'get_logger',
 ]
 
+
+def __getattr__(name):
+    """Import a public name from its submodule on first access."""
+    if name not in _LAZY_IMPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    
+    value = getattr(importlib.import_module(_LAZY_IMPORTS[name]), name)
+    globals()[name] = value  # Later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -3,10 +3,21 @@ Configuration Loader Module
 Loads and validates configuration from config.yaml.
 """
 
+import functools
+import os
 import yaml
 from pathlib import Path
 from typing import Dict, Any, Optional
 
+# Use the libyaml C loader when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+# Marks a missing key in cached lookups, since None is a valid config value
+_MISSING = object()
+
 
 class ConfigLoader:
     """Load and manage configuration from YAML files."""
@@ -20,6 +31,9 @@ class ConfigLoader:
         """
         self.config_path = Path(config_path)
         self.config: Optional[Dict[str, Any]] = None
+        self._mtime_ns: Optional[int] = None
+        # Per-instance memo of dot-path lookups, cleared on load() and save()
+        self._get_cached = functools.lru_cache(maxsize=256)(self._get_impl)
         self.load()
     
     def load(self) -> Dict[str, Any]:
@@ -28,14 +42,38 @@ class ConfigLoader:
             raise FileNotFoundError(f"Config file not found: {self.config_path}")
         
         with open(self.config_path, 'r', encoding='utf-8') as f:
-            self.config = yaml.safe_load(f)
+            self._mtime_ns = os.fstat(f.fileno()).st_mtime_ns
+            self.config = yaml.load(f, Loader=SafeLoader)
         
+        self.clear_cache()
         return self.config
     
+    def reload_if_changed(self) -> bool:
+        """
+        Reload the configuration if the file was modified since the last load.
+        
+        Returns:
+            True if the configuration was reloaded
+        """
+        try:
+            mtime_ns = self.config_path.stat().st_mtime_ns
+        except OSError:
+            return False
+        
+        if mtime_ns == self._mtime_ns:
+            return False
+        
+        self.load()
+        return True
+    
     def get(self, key_path: str, default: Any = None) -> Any:
         """
         Get configuration value using dot notation.
         
+        Lookups are cached per key path. If self.config is edited in place,
+        call clear_cache() (save() and load() also do this) before reading
+        the edited keys, otherwise get() returns the previous values.
+        
         Args:
             key_path: Dot-separated path (e.g., 'job_preferences.remote_only')
             default: Default value if key not found
@@ -46,14 +84,18 @@ class ConfigLoader:
         if self.config is None:
             self.load()
         
-        keys = key_path.split('.')
+        value = self._get_cached(key_path)
+        return default if value is _MISSING else value
+    
+    def _get_impl(self, key_path: str) -> Any:
+        """Walk the config for key_path, returning _MISSING if not found."""
         value = self.config
         
-        for key in keys:
+        for key in key_path.split('.'):
             if isinstance(value, dict) and key in value:
                 value = value[key]
             else:
-                return default
+                return _MISSING
         
         return value
     
@@ -64,9 +106,16 @@ class ConfigLoader:
         
         output_path = output_path or self.config_path
         
+        # Pick up any in-place edits to self.config in later get() calls
+        self.clear_cache()
+        
         with open(output_path, 'w', encoding='utf-8') as f:
             yaml.dump(self.config, f, default_flow_style=False, sort_keys=False)
     
+    def clear_cache(self) -> None:
+        """Forget cached get() lookups, e.g. after editing self.config in place."""
+        self._get_cached.cache_clear()
+    
     def validate(self) -> bool:
         """
         Validate configuration structure.
@@ -92,14 +141,14 @@ class ConfigLoader:
         return True
 
 
-# Global config instance
-_config = None
+@functools.lru_cache(maxsize=None)
+def _config_for_path(config_path: str) -> ConfigLoader:
+    """Create the shared config instance for a config file."""
+    return ConfigLoader(config_path)
 
 
 def get_config(config_path: str = "config.yaml") -> ConfigLoader:
-    """Get or create global config instance."""
-    global _config
-    if _config is None:
-        _config = ConfigLoader(config_path)
-    return _config
-
+    """Get or create the global config instance for config_path, reloading it if the file changed."""
+    config = _config_for_path(config_path)
+    config.reload_if_changed()
+    return config
@@ -3,13 +3,111 @@ Document Parser Module
 Supports parsing of PDF, DOCX, TXT, MD, and JSON files for profile extraction.
 """
 
+import codecs
 import json
+import multiprocessing
 import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from typing import Dict, List, Optional, Union
+from typing import Dict, Iterator, List, Optional, Union
 
 import fitz  # PyMuPDF
 from docx import Document
+from lxml import etree  # Installed with python-docx
+
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Shared encoder for nested JSON values: single-line output (the text is
+# only embedded, so indentation is wasted work) and non-ASCII kept as-is
+_JSON_ENCODER = json.JSONEncoder(ensure_ascii=False, separators=(', ', ': '))
+
+# WordprocessingML element names used when reading DOCX XML directly
+_W_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+_W_BODY = _W_NS + 'body'
+_W_P = _W_NS + 'p'
+_W_R = _W_NS + 'r'
+_W_HYPERLINK = _W_NS + 'hyperlink'
+_W_T = _W_NS + 't'
+_W_BR = _W_NS + 'br'
+_W_TYPE = _W_NS + 'type'
+
+# Fixed text for other run elements, as in python-docx's Run.text
+_DOCX_RUN_SYMBOLS = {
+    _W_NS + 'tab': '\t',
+    _W_NS + 'ptab': '\t',
+    _W_NS + 'cr': '\n',
+    _W_NS + 'noBreakHyphen': '-',
+}
+
+
+def _format_json_entry(key: str, value: any) -> str:
+    """Format one top-level JSON entry as 'key: value' text."""
+    if isinstance(value, (dict, list)):
+        return f"{key}: {_JSON_ENCODER.encode(value)}"
+    return f"{key}: {value}"
+
+
+def _peek_json_char(f) -> bytes:
+    """
+    Return the first non-whitespace byte of a binary file.
+    
+    The file is left positioned at the start of the JSON text, just past
+    a UTF-8 byte order mark if there is one.
+    """
+    start = len(codecs.BOM_UTF8) if f.read(len(codecs.BOM_UTF8)) == codecs.BOM_UTF8 else 0
+    f.seek(start)
+    char = f.read(1)
+    while char and char.isspace():
+        char = f.read(1)
+    f.seek(start)
+    return char
+
+
+class _DuplicateJSONKey(Exception):
+    """Raised when streaming hits a repeated key, which json.load resolves as last-wins."""
+
+
+def _iter_docx_paragraphs(source) -> Iterator[str]:
+    """Yield the text of each body-level paragraph in a DOCX document.xml stream."""
+    for _, paragraph in etree.iterparse(source, events=('end',), tag=_W_P):
+        parent = paragraph.getparent()
+        if parent is None or parent.tag != _W_BODY:
+            continue  # Table cell paragraphs are not part of Document.paragraphs
+        
+        # Same runs python-docx reads: direct children and hyperlink runs
+        parts = []
+        for child in paragraph:
+            runs = child.iterchildren(_W_R) if child.tag == _W_HYPERLINK else (child,)
+            for run in runs:
+                if run.tag == _W_R:
+                    parts.extend(_docx_run_text(elem) for elem in run)
+        yield ''.join(parts)
+        
+        # Free this paragraph and everything before it to keep memory flat
+        paragraph.clear()
+        while paragraph.getprevious() is not None:
+            del parent[0]
+
+
+def _docx_run_text(elem) -> str:
+    """Return the text a single run child element contributes."""
+    if elem.tag == _W_T:
+        return elem.text or ''
+    if elem.tag == _W_BR:
+        # Only line breaks count; page and column breaks add no text
+        return '\n' if elem.get(_W_TYPE, 'textWrapping') == 'textWrapping' else ''
+    return _DOCX_RUN_SYMBOLS.get(elem.tag, '')
 
 
 class DocumentParser:
@@ -30,9 +128,15 @@ class DocumentParser:
         """
         file_path = Path(file_path)
         
-        if not file_path.exists():
+        try:
+            file_size = file_path.stat().st_size
+        except FileNotFoundError:
             raise FileNotFoundError(f"File not found: {file_path}")
         
+        return self._parse_with_stat(file_path, file_size)
+    
+    def _parse_with_stat(self, file_path: Path, file_size: int) -> Dict[str, any]:
+        """Parse a document whose size is already known, without re-statting it."""
         file_ext = file_path.suffix.lower()
         
         if file_ext not in self.supported_formats:
@@ -54,7 +158,7 @@ class DocumentParser:
             'metadata': {
                 'file_path': str(file_path),
                 'file_name': file_path.name,
-                'file_size': file_path.stat().st_size,
+                'file_size': file_size,
                 'format': file_ext,
             },
             'format': file_ext,
@@ -66,10 +170,10 @@ class DocumentParser:
         
         try:
             doc = fitz.open(file_path)
-            for page_num in range(len(doc)):
-                page = doc[page_num]
-                text = page.get_text()
-                text_parts.append(text)
+            for page in doc:
+                # Raw text blocks skip the plain-text reflow pass; type 0 blocks hold text
+                blocks = page.get_text("blocks", flags=fitz.TEXTFLAGS_BLOCKS)
+                text_parts.append(''.join(block[4] for block in blocks if block[6] == 0))
             doc.close()
         except Exception as e:
             raise ValueError(f"Error parsing PDF {file_path}: {e}")
@@ -77,11 +181,22 @@ class DocumentParser:
         return '\n\n'.join(text_parts)
     
     def _parse_docx(self, file_path: Path) -> str:
-        """Extract text from DOCX file."""
+        """
+        Extract text from DOCX file.
+        
+        Streams word/document.xml through lxml's iterparse rather than
+        building python-docx's object model, collecting the same body
+        paragraphs as Document.paragraphs. python-docx is only used for
+        packages without a standard word/document.xml part.
+        """
         try:
-            doc = Document(file_path)
-            paragraphs = [para.text for para in doc.paragraphs]
-            return '\n\n'.join(paragraphs)
+            with zipfile.ZipFile(file_path) as package:
+                if 'word/document.xml' not in package.namelist():
+                    doc = Document(file_path)
+                    return '\n\n'.join(para.text for para in doc.paragraphs)
+                
+                with package.open('word/document.xml') as source:
+                    return '\n\n'.join(_iter_docx_paragraphs(source))
         except Exception as e:
             raise ValueError(f"Error parsing DOCX {file_path}: {e}")
     
@@ -100,31 +215,69 @@ class DocumentParser:
     def _parse_json(self, file_path: Path) -> str:
         """Extract text from JSON file (flattened)."""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
+            if IJSON_AVAILABLE:
+                try:
+                    return self._parse_json_stream(file_path)
+                except (ijson.JSONError, _DuplicateJSONKey):
+                    # ijson rejects some input json.load accepts (NaN, huge
+                    # integers) and can't apply last-wins to duplicate keys
+                    pass
+            
+            with open(file_path, 'r', encoding='utf-8-sig') as f:
                 data = json.load(f)
             
             # Flatten JSON to text representation
             if isinstance(data, dict):
-                text_parts = []
-                for key, value in data.items():
-                    if isinstance(value, (dict, list)):
-                        text_parts.append(f"{key}: {json.dumps(value, indent=2)}")
-                    else:
-                        text_parts.append(f"{key}: {value}")
-                return '\n'.join(text_parts)
+                return '\n'.join(_format_json_entry(key, value) for key, value in data.items())
             elif isinstance(data, list):
-                return '\n'.join([json.dumps(item, indent=2) for item in data])
+                return '\n'.join([_JSON_ENCODER.encode(item) for item in data])
             else:
                 return str(data)
         except Exception as e:
             raise ValueError(f"Error parsing JSON {file_path}: {e}")
     
-    def parse_directory(self, directory: Union[str, Path]) -> List[Dict[str, any]]:
+    def _parse_json_stream(self, file_path: Path) -> str:
+        """
+        Flatten a JSON file with ijson, one top-level entry at a time.
+        
+        Produces the same text as the json.load path, but only the largest
+        top-level value is ever held in memory as Python objects. Raises
+        ijson.JSONError or _DuplicateJSONKey for input that only the
+        json.load path handles.
+        """
+        with open(file_path, 'rb') as f:
+            first_char = _peek_json_char(f)
+            
+            if first_char == b'{':
+                text_parts = []
+                seen_keys = set()
+                for key, value in ijson.kvitems(f, '', use_float=True):
+                    if key in seen_keys:
+                        raise _DuplicateJSONKey(key)
+                    seen_keys.add(key)
+                    text_parts.append(_format_json_entry(key, value))
+                return '\n'.join(text_parts)
+            elif first_char == b'[':
+                items = ijson.items(f, 'item', use_float=True)
+                return '\n'.join(_JSON_ENCODER.encode(item) for item in items)
+            else:
+                return str(json.load(f))
+    
+    def parse_directory(
+        self,
+        directory: Union[str, Path],
+        max_workers: Optional[int] = None,
+    ) -> List[Dict[str, any]]:
         """
         Parse all supported documents in a directory.
         
+        Files are parsed in parallel across worker processes since PDF/DOCX
+        extraction is CPU-bound. A file that fails to parse is reported and
+        skipped without affecting the others.
+        
         Args:
             directory: Path to directory containing documents
+            max_workers: Number of worker processes (defaults to CPU count)
             
         Returns:
             List of parsed document dictionaries
@@ -133,16 +286,42 @@ class DocumentParser:
         if not directory.is_dir():
             raise ValueError(f"Not a directory: {directory}")
         
-        parsed_docs = []
-        for file_path in directory.iterdir():
-            if file_path.is_file() and file_path.suffix.lower() in self.supported_formats:
+        # One scandir pass supplies file type and size, avoiding per-file stat calls
+        files = []
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if os.path.splitext(entry.name)[1].lower() in self.supported_formats and entry.is_file():
+                    files.append((Path(entry.path), entry.stat().st_size))
+        files.sort()
+        if not files:
+            return []
+        
+        max_workers = min(max_workers or os.cpu_count() or 1, len(files))
+        results: Dict[int, Dict[str, any]] = {}
+        
+        if max_workers == 1:
+            for i, (file_path, file_size) in enumerate(files):
                 try:
-                    parsed = self.parse(file_path)
-                    parsed_docs.append(parsed)
+                    results[i] = self._parse_with_stat(file_path, file_size)
                 except Exception as e:
                     print(f"Warning: Failed to parse {file_path}: {e}")
+        else:
+            # Spawn rather than fork: callers may already run threads (e.g. the log listener)
+            context = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(max_workers=max_workers, mp_context=context) as executor:
+                futures = {
+                    executor.submit(self._parse_with_stat, file_path, file_size): i
+                    for i, (file_path, file_size) in enumerate(files)
+                }
+                for future in as_completed(futures):
+                    i = futures[future]
+                    try:
+                        results[i] = future.result()
+                    except Exception as e:
+                        print(f"Warning: Failed to parse {files[i][0]}: {e}")
         
-        return parsed_docs
+        # Keep output in directory order regardless of completion order
+        return [results[i] for i in sorted(results)]
     
     def chunk_text(self, text: str, chunk_size: int = 500, overlap: int = 50) -> List[str]:
         """
@@ -207,8 +386,14 @@ def create_profile_json(parsed_docs: List[Dict[str, any]], output_path: Union[st
         profile['sections'].append(section)
     
     output_path = Path(output_path)
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(profile, f, indent=2, ensure_ascii=False)
+    if ORJSON_AVAILABLE:
+        # orjson emits UTF-8 bytes directly. Layout matches the json fallback,
+        # but floats may be written differently (e.g. 1e-05 as 0.00001)
+        with open(output_path, 'wb') as f:
+            f.write(orjson.dumps(profile, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+    else:
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(profile, f, indent=2, ensure_ascii=False)
     
     print(f"Profile saved to {output_path}")
 
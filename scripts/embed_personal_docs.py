@@ -56,13 +56,19 @@ def main():
     embedding_model = ai_config.get('embedding_model', 'all-MiniLM-L6-v2')
     dimension = ai_config.get('vector_db', {}).get('dimension', 384)
     index_type = ai_config.get('vector_db', {}).get('index_type', 'flat')
+    batch_size = ai_config.get('embedding_batch_size', 128)
+    num_workers = ai_config.get('embedding_workers')
+    cache_embeddings = ai_config.get('embedding_cache', True)
     
     logger.info(f"Initializing vector store with model: {embedding_model}")
     vector_store = VectorStore(
         embedding_model=embedding_model,
         dimension=dimension,
         index_type=index_type,
-        model_dir=Path("models")
+        model_dir=Path("models"),
+        batch_size=batch_size,
+        num_workers=num_workers,
+        cache_embeddings=cache_embeddings,
     )
     
     # Chunk and embed documents
@@ -100,8 +106,8 @@ def main():
         "work experience",
     ]
     
-    for query in test_queries:
-        results = vector_store.search(query, k=3)
+    batch_results = vector_store.search_batch(test_queries, k=3)
+    for query, results in zip(test_queries, batch_results):
         logger.info(f"Query: '{query}'")
         for score, metadata in results:
             logger.info(f"  Score: {score:.3f} - {metadata.get('source_file', 'unknown')}")
@@ -1,12 +1,22 @@
 """
 Logging Configuration Module
 Sets up structured logging with file rotation and colored console output.
+Records are handed to a background thread through a queue, so logging
+calls never block on formatting or disk I/O.
+
+Because console output is written by that thread, log lines can appear
+after print() output that was issued later (DocumentParser and
+VectorStore report progress with print()). This reordering is expected
+and does not affect the log file, where records stay in order.
 """
 
+import atexit
 import logging
+import queue
 import sys
 from pathlib import Path
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Dict
 
 try:
     import colorlog
@@ -14,6 +24,9 @@ try:
 except ImportError:
     COLORLOG_AVAILABLE = False
 
+# Background listeners by logger name, stopped on re-setup and at exit
+_listeners: Dict[str, QueueListener] = {}
+
 
 def setup_logger(
     name: str = "job_automation",
@@ -25,6 +38,9 @@ def setup_logger(
     """
     Set up a logger with file and console handlers.
     
+    The logger itself only enqueues records; a QueueListener thread
+    formats them and writes to the file and console handlers.
+    
     Args:
         name: Logger name
         log_file: Path to log file
@@ -38,7 +54,8 @@ def setup_logger(
     logger = logging.getLogger(name)
     logger.setLevel(getattr(logging, level.upper()))
     
-    # Clear existing handlers
+    # Clear existing handlers, flushing any records still queued
+    _stop_listener(name)
     logger.handlers.clear()
     
     # Create logs directory if it doesn't exist
@@ -57,7 +74,6 @@ def setup_logger(
         datefmt='%Y-%m-%d %H:%M:%S'
     )
     file_handler.setFormatter(file_formatter)
-    logger.addHandler(file_handler)
     
     # Console handler with colors (if available)
     console_handler = logging.StreamHandler(sys.stdout)
@@ -81,11 +97,37 @@ def setup_logger(
         )
     
     console_handler.setFormatter(console_formatter)
-    logger.addHandler(console_handler)
+    
+    # Hand records to a background thread instead of writing inline
+    log_queue = queue.Queue(-1)
+    logger.addHandler(QueueHandler(log_queue))
+    listener = QueueListener(
+        log_queue, file_handler, console_handler, respect_handler_level=True
+    )
+    listener.start()
+    _listeners[name] = listener
     
     return logger
 
 
+def _stop_listener(name: str) -> None:
+    """Stop a logger's background listener and close its handlers."""
+    listener = _listeners.pop(name, None)
+    if listener is None:
+        return
+    
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
+
+
+@atexit.register
+def _stop_all_listeners() -> None:
+    """Flush queued records before the interpreter exits."""
+    for name in list(_listeners):
+        _stop_listener(name)
+
+
 # Global logger instance
 _logger = None
 
@@ -112,11 +112,13 @@ def main():
     # Load vector store
     ai_config = config.get('ai_settings', {})
     embedding_model = ai_config.get('embedding_model', 'all-MiniLM-L6-v2')
+    batch_size = ai_config.get('embedding_batch_size', 128)
     
     logger.info("Loading vector store...")
     vector_store = VectorStore(
         embedding_model=embedding_model,
-        model_dir=Path("models")
+        model_dir=Path("models"),
+        batch_size=batch_size,
     )
     
     if vector_store.index is None or vector_store.index.ntotal == 0:
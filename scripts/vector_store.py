@@ -3,15 +3,144 @@ Vector Store Module
 Manages FAISS vector database for semantic search of profile documents.
 """
 
+import hashlib
 import json
+import math
+import mmap
+import multiprocessing
 import os
 import pickle
+import sqlite3
+from collections.abc import Sequence
+from contextlib import closing
 from pathlib import Path
 from typing import List, Optional, Tuple
 
 import faiss
 import numpy as np
-from sentence_transformers import SentenceTransformer
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# IVF-PQ parameters
+IVF_NLIST = 100
+IVF_NPROBE = 10
+IVF_MIN_TRAINING_VECTORS = 256  # 8-bit PQ codebooks need 2^8 training points
+
+# HNSW parameters
+HNSW_M = 32
+HNSW_EF_CONSTRUCTION = 200
+HNSW_EF_SEARCH = 64
+
+# Minimum texts per encoder process; below this, model start-up outweighs the speedup
+MIN_TEXTS_PER_WORKER = 256
+
+# Max SQL parameters per embedding cache lookup (SQLite's default limit is 999)
+CACHE_LOOKUP_BATCH = 500
+
+# Embedding model loaded once per encoder worker process
+_worker_model = None
+
+
+def _load_model(model_name: str) -> None:
+    """Initialize an encoder worker process with its own model copy."""
+    global _worker_model
+    import torch
+    from sentence_transformers import SentenceTransformer
+    torch.set_num_threads(1)  # Parallelism comes from the processes
+    _worker_model = SentenceTransformer(model_name, device='cpu')
+
+
+def _accelerator_available() -> bool:
+    """Return True if sentence-transformers would run on a GPU (CUDA or Apple MPS)."""
+    import torch
+    mps = getattr(torch.backends, 'mps', None)
+    return torch.cuda.is_available() or (mps is not None and mps.is_available())
+
+
+def _encode_shard(args: Tuple[List[str], int]) -> np.ndarray:
+    """Encode one shard of texts in a worker process."""
+    shard, batch_size = args
+    embeddings = _worker_model.encode(
+        shard,
+        batch_size=batch_size,
+        convert_to_numpy=True,
+        normalize_embeddings=True,
+    )
+    # Halve the bytes sent back to the parent
+    return embeddings.astype(np.float16)
+
+
+def _pq_subquantizers(dimension: int, max_m: int = 48) -> int:
+    """Return the largest PQ sub-quantizer count <= max_m that divides dimension."""
+    for m in range(min(max_m, dimension), 0, -1):
+        if dimension % m == 0:
+            return m
+    return 1
+
+
+def _prefault_file(path: Path) -> None:
+    """
+    Pull a file into the OS page cache so first accesses don't page-fault.
+    
+    Uses MAP_POPULATE where available (Linux), otherwise asks for readahead
+    with posix_fadvise. Best effort: does nothing on other platforms or errors.
+    """
+    try:
+        with open(path, 'rb') as f:
+            fd = f.fileno()
+            if os.fstat(fd).st_size == 0:
+                return
+            if hasattr(mmap, 'MAP_POPULATE'):
+                mapping = mmap.mmap(
+                    fd, 0, flags=mmap.MAP_SHARED | mmap.MAP_POPULATE, prot=mmap.PROT_READ
+                )
+                mapping.close()
+            elif hasattr(os, 'posix_fadvise'):
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+    except OSError:
+        pass
+
+
+class ArrowMetadata(Sequence):
+    """
+    Read-only metadata list backed by a memory-mapped Arrow IPC file.
+    
+    Each row is stored as a JSON string, so any metadata that can be
+    saved as JSON round-trips unchanged. Rows are only decoded when
+    accessed, so loading is O(1) and untouched metadata stays in the OS
+    page cache.
+    """
+    
+    def __init__(self, path: Path):
+        source = pa.memory_map(str(path), 'r')
+        self.rows = pa.ipc.open_file(source).read_all().column('row')
+    
+    def __len__(self) -> int:
+        return len(self.rows)
+    
+    def __getitem__(self, idx: int) -> dict:
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError("metadata index out of range")
+        return json.loads(self.rows[idx].as_py())
+    
+    def __iter__(self):
+        return (json.loads(row) for row in self.rows.to_pylist())
+    
+    @staticmethod
+    def write(metadata: List[dict], path: Path) -> None:
+        """Write metadata dicts to an Arrow IPC file as a column of JSON strings."""
+        rows = pa.array([json.dumps(row, ensure_ascii=False) for row in metadata], type=pa.string())
+        table = pa.table({'row': rows})
+        with pa.OSFile(str(path), 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
 
 
 class VectorStore:
@@ -23,6 +152,9 @@ class VectorStore:
         dimension: int = 384,
         index_type: str = "flat",
         model_dir: Optional[Path] = None,
+        batch_size: int = 128,
+        num_workers: Optional[int] = None,
+        cache_embeddings: bool = True,
     ):
         """
         Initialize vector store.
@@ -30,44 +162,100 @@ class VectorStore:
         Args:
             embedding_model: Name of sentence transformer model
             dimension: Embedding dimension
-            index_type: Type of FAISS index ('flat', 'ivf', 'hnsw')
+            index_type: Type of FAISS index ('flat', 'fp16', 'ivf', 'hnsw', 'sq8')
             model_dir: Directory to save/load models
+            batch_size: Number of texts encoded per forward pass
+            num_workers: Encoder processes on CPU-only hosts (defaults to CPU count, 1 disables)
+            cache_embeddings: Reuse embeddings of previously seen chunks from model_dir/embedding_cache.db
         """
         self.embedding_model_name = embedding_model
         self.dimension = dimension
         self.index_type = index_type
+        self.batch_size = batch_size
+        self.num_workers = num_workers or os.cpu_count() or 1
         self.model_dir = Path(model_dir) if model_dir else Path("models")
         self.model_dir.mkdir(exist_ok=True)
+        self.cache_path = self.model_dir / "embedding_cache.db" if cache_embeddings else None
+        
+        # Leave half the cores to the encoder instead of letting FAISS claim them all
+        faiss.omp_set_num_threads(max(1, (os.cpu_count() or 1) // 2))
         
-        # Load embedding model
-        print(f"Loading embedding model: {embedding_model}")
-        self.embedder = SentenceTransformer(embedding_model)
+        # Embedding model is loaded on first use (see the embedder property)
+        self._embedder = None
         
         # Initialize FAISS index
         self.index = None
         self.metadata = []  # Store metadata for each vector
+        self._mmap_index_path: Optional[Path] = None  # Set while IVF lists are memory-mapped
         
         # Load existing index if available
         self._load_index()
     
+    @property
+    def embedder(self):
+        """Sentence transformer model, imported and loaded on first access."""
+        if self._embedder is None:
+            from sentence_transformers import SentenceTransformer
+            print(f"Loading embedding model: {self.embedding_model_name}")
+            self._embedder = SentenceTransformer(self.embedding_model_name)
+        return self._embedder
+    
     def _create_index(self) -> faiss.Index:
-        """Create a new FAISS index based on index_type."""
+        """
+        Create a new FAISS index based on index_type.
+        
+        Embeddings are L2-normalized, so all indexes use inner product
+        (cosine similarity) as the metric.
+        """
+        metric = faiss.METRIC_INNER_PRODUCT
+        
         if self.index_type == "flat":
             # Exact search, slower but most accurate
-            index = faiss.IndexFlatL2(self.dimension)
+            index = faiss.IndexFlatIP(self.dimension)
         elif self.index_type == "ivf":
-            # Inverted file index, faster for large datasets
-            # Note: Requires training, so we'll use flat for now
-            index = faiss.IndexFlatL2(self.dimension)
+            # Inverted file index with product quantization, faster for large datasets
+            # Note: Requires training on the first batch of vectors
+            quantizer = faiss.IndexFlatIP(self.dimension)
+            index = faiss.IndexIVFPQ(
+                quantizer, self.dimension, IVF_NLIST, _pq_subquantizers(self.dimension), 8, metric
+            )
+            index.nprobe = IVF_NPROBE
         elif self.index_type == "hnsw":
             # Hierarchical Navigable Small World, good balance
-            # Note: Requires faiss-gpu or special build
-            index = faiss.IndexFlatL2(self.dimension)
+            index = faiss.IndexHNSWFlat(self.dimension, HNSW_M, metric)
+            index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+            index.hnsw.efSearch = HNSW_EF_SEARCH
+        elif self.index_type == "fp16":
+            # Exact search over float16 vectors, half the memory of flat
+            index = faiss.IndexScalarQuantizer(
+                self.dimension, faiss.ScalarQuantizer.QT_fp16, metric
+            )
+        elif self.index_type == "sq8":
+            # 8-bit scalar quantization, 4x smaller than flat with near-exact results
+            index = faiss.IndexScalarQuantizer(
+                self.dimension, faiss.ScalarQuantizer.QT_8bit_uniform, metric
+            )
+            # Embeddings are unit-norm, so every component lies in [-1, 1]; train
+            # on that fixed range rather than on whatever the first batch holds
+            bounds = np.ones((2, self.dimension), dtype=np.float32)
+            bounds[0] = -1
+            index.train(bounds)
         else:
             raise ValueError(f"Unsupported index type: {self.index_type}")
         
         return index
     
+    def _train_index(self, embeddings: np.ndarray) -> None:
+        """Train an index that needs it (IVF) on the given vectors."""
+        if self.index_type == "ivf" and len(embeddings) < IVF_MIN_TRAINING_VECTORS:
+            raise ValueError(
+                f"IVF index needs at least {IVF_MIN_TRAINING_VECTORS} vectors to train, "
+                f"got {len(embeddings)}. Use 'flat', 'fp16', 'hnsw' or 'sq8' for small collections."
+            )
+        
+        print(f"Training {self.index_type} index on {len(embeddings)} vectors...")
+        self.index.train(embeddings)
+    
     def add_documents(self, texts: List[str], metadata: Optional[List[dict]] = None) -> None:
         """
         Add documents to the vector store.
@@ -79,18 +267,29 @@ class VectorStore:
         if not texts:
             return
         
-        print(f"Embedding {len(texts)} documents...")
-        embeddings = self.embedder.encode(texts, show_progress_bar=True, convert_to_numpy=True)
+        # Encode each distinct chunk once; duplicates keep their own vector slot and metadata
+        unique_positions = {}
+        inverse = [unique_positions.setdefault(text, len(unique_positions)) for text in texts]
+        unique_texts = list(unique_positions)
         
-        # Normalize embeddings for better cosine similarity
-        faiss.normalize_L2(embeddings)
+        print(f"Embedding {len(texts)} documents ({len(unique_texts)} unique)...")
+        if self.cache_path:
+            unique_embeddings = self._encode_cached(unique_texts)
+        else:
+            unique_embeddings = self._encode(unique_texts)
+        embeddings = np.take(unique_embeddings, inverse, axis=0)
         
         # Create index if it doesn't exist
         if self.index is None:
             self.index = self._create_index()
+        else:
+            self._load_into_memory()
+        
+        if not self.index.is_trained:
+            self._train_index(embeddings)
         
         # Add to index
-        self.index.add(embeddings.astype('float32'))
+        self.index.add(embeddings)
         
         # Store metadata
         if metadata:
@@ -101,6 +300,96 @@ class VectorStore:
         
         print(f"Added {len(texts)} documents. Total vectors: {self.index.ntotal}")
     
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        """Encode texts into L2-normalized float32 embeddings."""
+        num_workers = min(self.num_workers, len(texts) // MIN_TEXTS_PER_WORKER)
+        # Checked without touching self.embedder, so the pool path never loads a model in this process
+        if num_workers > 1 and not _accelerator_available():
+            embeddings = self._encode_multiprocess(texts, num_workers)
+        else:
+            embeddings = self.embedder.encode(
+                texts,
+                batch_size=self.batch_size,
+                show_progress_bar=True,
+                convert_to_numpy=True,
+                normalize_embeddings=True,
+            )
+        
+        # No copy unless the encoder returned something other than contiguous float32
+        return np.ascontiguousarray(embeddings, dtype=np.float32)
+    
+    def _encode_cached(self, texts: List[str]) -> np.ndarray:
+        """
+        Encode texts, reusing embeddings cached on disk by content hash.
+        
+        Only texts not already in the cache are run through the model; their
+        embeddings are then written back for the next run.
+        """
+        hashes = [hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest() for text in texts]
+        
+        with closing(sqlite3.connect(self.cache_path)) as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "model TEXT NOT NULL, hash BLOB NOT NULL, vector BLOB NOT NULL, "
+                "PRIMARY KEY (model, hash))"
+            )
+            
+            cached = {}
+            unique_hashes = list(dict.fromkeys(hashes))
+            for i in range(0, len(unique_hashes), CACHE_LOOKUP_BATCH):
+                batch = unique_hashes[i:i + CACHE_LOOKUP_BATCH]
+                rows = conn.execute(
+                    f"SELECT hash, vector FROM embeddings WHERE model = ? "
+                    f"AND hash IN ({','.join('?' * len(batch))})",
+                    [self.embedding_model_name, *batch],
+                )
+                cached.update(rows)
+            
+            missing = [i for i, h in enumerate(hashes) if h not in cached]
+            print(f"Found {len(texts) - len(missing)} cached embeddings, encoding {len(missing)}")
+            
+            embeddings = np.empty((len(texts), self.dimension), dtype=np.float32)
+            for i, h in enumerate(hashes):
+                if h in cached:
+                    embeddings[i] = np.frombuffer(cached[h], dtype=np.float32)
+            
+            if missing:
+                embeddings[missing] = self._encode([texts[i] for i in missing])
+                with conn:
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO embeddings (model, hash, vector) VALUES (?, ?, ?)",
+                        [
+                            (self.embedding_model_name, hashes[i], embeddings[i].tobytes())
+                            for i in missing
+                        ],
+                    )
+        
+        return embeddings
+    
+    def _encode_multiprocess(self, texts: List[str], num_workers: int) -> np.ndarray:
+        """
+        Encode texts across worker processes, each with its own model copy.
+        
+        Tokenization holds the GIL, so on CPU-only hosts a single process
+        cannot keep all cores busy.
+        """
+        print(f"Encoding with {num_workers} worker processes...")
+        shard_size = math.ceil(len(texts) / num_workers)
+        shards = [
+            (texts[i:i + shard_size], self.batch_size)
+            for i in range(0, len(texts), shard_size)
+        ]
+        
+        context = multiprocessing.get_context('spawn')
+        with context.Pool(
+            processes=len(shards),
+            initializer=_load_model,
+            initargs=(self.embedding_model_name,),
+        ) as pool:
+            parts = pool.map(_encode_shard, shards)
+        
+        return np.concatenate(parts)
+    
     def search(self, query: str, k: int = 5) -> List[Tuple[float, dict]]:
         """
         Search for similar documents.
@@ -112,69 +401,147 @@ class VectorStore:
         Returns:
             List of (score, metadata) tuples, sorted by relevance
         """
-        if self.index is None or self.index.ntotal == 0:
-            return []
+        return self.search_batch([query], k)[0]
+    
+    def search_batch(self, queries: List[str], k: int = 5) -> List[List[Tuple[float, dict]]]:
+        """
+        Search for similar documents for several queries at once.
         
-        # Embed query
-        query_embedding = self.embedder.encode([query], convert_to_numpy=True)
-        faiss.normalize_L2(query_embedding)
+        All queries are embedded in one encoder call and searched in one
+        FAISS call, which is much cheaper than calling search() per query.
+        
+        Args:
+            queries: Search query texts
+            k: Number of results to return per query
+            
+        Returns:
+            One list of (score, metadata) tuples per query, sorted by relevance
+        """
+        if not queries or self.index is None or self.index.ntotal == 0:
+            return [[] for _ in queries]
+        
+        # Embed queries
+        query_embeddings = self.embedder.encode(
+            queries,
+            batch_size=len(queries),
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+        )
         
         # Search
         k = min(k, self.index.ntotal)
-        distances, indices = self.index.search(query_embedding.astype('float32'), k)
+        query_embeddings = np.ascontiguousarray(query_embeddings, dtype=np.float32)
+        distances, indices = self.index.search(query_embeddings, k)
+        
+        # Inner product indexes already score by cosine similarity; indexes
+        # saved before the metric switch use L2 distance (lower = more similar)
+        use_l2 = self.index.metric_type == faiss.METRIC_L2
         
-        # Convert distances to similarity scores (L2 distance -> similarity)
-        # Lower distance = higher similarity
-        results = []
-        for i, (distance, idx) in enumerate(zip(distances[0], indices[0])):
-            if idx < len(self.metadata):
-                # Convert L2 distance to similarity (1 / (1 + distance))
-                similarity = 1 / (1 + distance)
-                results.append((similarity, self.metadata[idx]))
+        all_results = []
+        for row_distances, row_indices in zip(distances, indices):
+            results = []
+            for distance, idx in zip(row_distances, row_indices):
+                if 0 <= idx < len(self.metadata):
+                    # Convert L2 distance to similarity (1 / (1 + distance))
+                    similarity = 1 / (1 + distance) if use_l2 else float(distance)
+                    results.append((similarity, self.metadata[idx]))
+            all_results.append(results)
         
-        return results
+        return all_results
     
     def save(self, index_path: Optional[Path] = None, metadata_path: Optional[Path] = None) -> None:
-        """Save index and metadata to disk."""
+        """
+        Save index and metadata to disk.
+        
+        By default metadata is written as an Arrow IPC file when pyarrow is
+        installed, otherwise as JSON. An explicit metadata_path is written
+        as Arrow if it ends in '.arrow' and as JSON otherwise.
+        """
         if self.index is None:
             print("No index to save.")
             return
         
-        index_path = index_path or self.model_dir / "faiss_index.bin"
-        metadata_path = metadata_path or self.model_dir / "faiss_metadata.json"
+        default_metadata = metadata_path is None
+        metadata_name = "faiss_metadata.arrow" if PYARROW_AVAILABLE else "faiss_metadata.json"
+        index_path = Path(index_path) if index_path else self.model_dir / "faiss_index.bin"
+        metadata_path = Path(metadata_path) if metadata_path else self.model_dir / metadata_name
+        
+        use_arrow = metadata_path.suffix == '.arrow'
+        if use_arrow and not PYARROW_AVAILABLE:
+            raise ImportError(f"pyarrow is required to write Arrow metadata: {metadata_path}")
+        
+        # Release memory-mapped files before they are overwritten
+        self._load_into_memory()
+        
+        # Save metadata first, so metadata that can't be serialized leaves
+        # the index on disk untouched
+        if use_arrow:
+            ArrowMetadata.write(self.metadata, metadata_path)
+        else:
+            with open(metadata_path, 'w', encoding='utf-8') as f:
+                json.dump(self.metadata, f, indent=2, ensure_ascii=False)
         
         # Save FAISS index
         faiss.write_index(self.index, str(index_path))
         
-        # Save metadata
-        with open(metadata_path, 'w', encoding='utf-8') as f:
-            json.dump(self.metadata, f, indent=2, ensure_ascii=False)
+        # Remove default metadata left in the other format, so the next load
+        # can't pair it with this index
+        if default_metadata:
+            stale_suffix = '.json' if use_arrow else '.arrow'
+            metadata_path.with_suffix(stale_suffix).unlink(missing_ok=True)
         
         print(f"Saved index to {index_path}")
         print(f"Saved metadata to {metadata_path}")
     
     def _load_index(self) -> None:
-        """Load existing index and metadata from disk."""
+        """
+        Load existing index and metadata from disk.
+        
+        Both are memory-mapped where possible: IVF inverted lists with
+        faiss.IO_FLAG_MMAP and Arrow metadata with pa.memory_map. JSON
+        metadata from older saves is still read.
+        """
         index_path = self.model_dir / "faiss_index.bin"
-        metadata_path = self.model_dir / "faiss_metadata.json"
+        arrow_path = self.model_dir / "faiss_metadata.arrow"
+        json_path = self.model_dir / "faiss_metadata.json"
         
-        if index_path.exists() and metadata_path.exists():
+        use_arrow = PYARROW_AVAILABLE and arrow_path.exists()
+        if index_path.exists() and (use_arrow or json_path.exists()):
             try:
-                self.index = faiss.read_index(str(index_path))
+                self.index = faiss.read_index(str(index_path), faiss.IO_FLAG_MMAP)
+                # Only IVF inverted lists are actually mapped (and read-only);
+                # other index types are read fully into memory
+                if faiss.try_extract_index_ivf(self.index) is not None:
+                    self._mmap_index_path = index_path
+                    _prefault_file(index_path)
                 
-                with open(metadata_path, 'r', encoding='utf-8') as f:
-                    self.metadata = json.load(f)
+                if use_arrow:
+                    self.metadata = ArrowMetadata(arrow_path)
+                else:
+                    with open(json_path, 'r', encoding='utf-8') as f:
+                        self.metadata = json.load(f)
                 
                 print(f"Loaded existing index with {self.index.ntotal} vectors")
             except Exception as e:
                 print(f"Warning: Failed to load existing index: {e}")
                 self.index = None
                 self.metadata = []
+                self._mmap_index_path = None
+    
+    def _load_into_memory(self) -> None:
+        """Replace memory-mapped index and metadata with in-memory copies so they can be modified."""
+        if self._mmap_index_path is not None:
+            self.index = faiss.read_index(str(self._mmap_index_path))
+            self._mmap_index_path = None
+        
+        if not isinstance(self.metadata, list):
+            self.metadata = list(self.metadata)
     
     def clear(self) -> None:
         """Clear all vectors from the index."""
         self.index = None
         self.metadata = []
+        self._mmap_index_path = None
         print("Vector store cleared.")
 
 